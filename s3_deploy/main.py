@@ -1,16 +1,38 @@
 #!/usr/bin/env python3
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
+import threading
 import re
 import os
 import argparse
+import asyncio
 import configparser
+import functools
+import gzip
+import json
 import pprint
 import hashlib
+import io
 import datetime
 import mimetypes
+import mmap
+
+# Optional - asyncio-based uploads need aioboto3 (pip install aioboto3)
+try:
+    import aioboto3
+except ImportError:
+    aioboto3 = None
+
+# Optional - brotli compresses text assets best; gzip is the stdlib fallback
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 LOCAL_DIR = os.path.dirname(os.path.realpath(__file__))
 BASE_DIR = os.path.dirname(LOCAL_DIR)
@@ -18,7 +40,35 @@ PACKAGE_DIR = BASE_DIR + "/packages"
 CONFIG_FILE = "s3_deploy.cfg"
 
 CACHE_SECONDS = 90 * 24 * 60 * 60
+CHECKSUM_CACHE_FILE = '.s3_deploy_cache.json'
+
+# Caching states
+CACHE_ALWAYS = f'max-age={CACHE_SECONDS}, public'
+CACHE_NEVER = 'max-age=0, no-cache, must-revalidate, proxy-revalidate, no-store'
 NO_CACHE_FILES = ['index.html', 'asset-manifest.json']
+NO_CACHE_SET = frozenset(NO_CACHE_FILES)
+
+# MIME types worth pre-compressing - images and fonts are already compressed
+COMPRESS_MIME_TYPES = frozenset(['application/javascript', 'text/javascript', 'text/css',
+                                 'text/html', 'application/json', 'image/svg+xml'])
+TRANSFER_WORKERS = 32
+ASYNC_TRANSFERS = 64
+
+# Large assets (source maps, vendor bundles) go up as parallel multipart uploads
+TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024,
+                                 multipart_chunksize=8 * 1024 * 1024,
+                                 max_concurrency=10, use_threads=True)
+
+# Shared client tuning - pool sized for the upload threads, adaptive retries,
+# keepalive to avoid connection churn under sustained transfers
+BOTO_CONFIG = Config(max_pool_connections=64,
+                     retries={'max_attempts': 10, 'mode': 'adaptive'},
+                     tcp_keepalive=True,
+                     s3={'addressing_style': 'virtual', 'use_accelerate_endpoint': False})
+
+# Mapping file type - all others should be defined
+mimetypes.init()
+mimetypes.add_type('application/octet-stream', '.map')
 
 PROG_DESC = """Build a create-react-app production deployment and copy to S3.
 
@@ -63,15 +113,49 @@ def prettyPrint(sVal):
     pprint.PrettyPrinter(indent=2).pprint(sVal)
 
 
+# Files larger than this are hashed through mmap rather than read into buffers
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Bodies up to this size are kept in memory after hashing so uploads skip a re-read
+BODY_CACHE_LIMIT = 32 * 1024 * 1024
+
+# Content-hashed build assets (e.g. main.52bad5f4.chunk.js) - the name changes with the content
+HASHED_FILE_RE = re.compile(r'\.[0-9a-f]{8,}(\.chunk)?\.(js|css|map|woff2?|png|jpg|svg)(\.map)?$')
+
+# Compiled once - these run per file or against whole manifest bodies
+PRECACHE_RE = re.compile(r'precache-manifest')
+URL_RE = re.compile(rb'"url": "/(.*?)"')
+ETAG_RE = re.compile(r'^"(.*)"$')
+
+
+def newMd5(bData=b''):
+    """Get an MD5 object for checksums, not security - takes OpenSSL's EVP fast path"""
+    try:
+        return hashlib.md5(bData, usedforsecurity=False)
+    except TypeError:
+        return hashlib.md5(bData)
+
+
 def md5Checksum(sPath):
     """Get the MD5 value for a file"""
     with open(sPath, 'rb') as fh:
-        m = hashlib.md5()
+
+        # Map large files so OpenSSL hashes the whole region without buffer copies
+        if os.path.getsize(sPath) > MMAP_THRESHOLD:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as oMap:
+                return newMd5(oMap).hexdigest()
+
+        # Python 3.11+ hashes in a C loop with the GIL released
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(fh, newMd5).hexdigest()
+
+        m = newMd5()
+        oBuffer = memoryview(bytearray(1 << 20))
         while True:
-            data = fh.read(8192)
-            if not data:
+            iRead = fh.readinto(oBuffer)
+            if not iRead:
                 break
-            m.update(data)
+            m.update(oBuffer[:iRead])
         return m.hexdigest()
 
 
@@ -91,25 +175,83 @@ def getArgParser():
                          help='create invalidation for CloudFront only')
     oParser.add_argument('-m', '--maintain-versions', action='store', dest='iVersions', type=int,
                          help='number of versions to maintain', metavar='VERSIONS')
+    oParser.add_argument('-a', '--async', action='store_true', dest='bAsyncTransfer',
+                         help='transfer with asyncio/aioboto3 (falls back to threads if not installed)')
     return oParser
 
 
-def searchList(sNeedle, aHaystack):
-    """Get the index of element in a list or return false"""
+def multipartChecksum(sPath):
+    """Get the multipart-style etag (md5-of-part-md5s-N) for a file"""
+    iChunkSize = TRANSFER_CONFIG.multipart_chunksize
+    aDigests = []
+    with open(sPath, 'rb') as fh:
+        while True:
+            bData = fh.read(iChunkSize)
+            if not bData:
+                break
+            aDigests.append(newMd5(bData).digest())
+    return '%s-%d' % (newMd5(b''.join(aDigests)).hexdigest(), len(aDigests))
+
+
+def md5ChecksumCached(sPath):
+    """Get the MD5 for a file plus, for small files, the body read while hashing"""
+    if os.path.getsize(sPath) > BODY_CACHE_LIMIT:
+        return md5Checksum(sPath), None
+    with open(sPath, 'rb') as fh:
+        bBody = fh.read()
+    return newMd5(bBody).hexdigest(), bBody
+
+
+def compressBody(bBody):
+    """Compress an upload body, returning the bytes and Content-Encoding value"""
+    if brotli is not None:
+        return brotli.compress(bBody, quality=11), 'br'
+    return gzip.compress(bBody, compresslevel=9), 'gzip'
+
+
+def decompressBody(bBody):
+    """Reverse compressBody for objects stored with Content-Encoding"""
+    if bBody[:2] == b'\x1f\x8b':
+        return gzip.decompress(bBody)
+    if brotli is not None:
+        try:
+            return brotli.decompress(bBody)
+        except brotli.error:
+            pass
+    return bBody
+
+
+def parseManifestUrls(bBody):
+    """Get the url entries from a precache manifest body"""
+    bBody = decompressBody(bBody)
     try:
-        return aHaystack.index(sNeedle)
+        oManifest = json.loads(bBody)
     except ValueError:
-        return False
+        # Workbox wraps the manifest in JS - fall back to pattern matching
+        return [sUrl.decode() for sUrl in URL_RE.findall(bBody)]
+    return [oEntry['url'][1:] if oEntry['url'].startswith('/') else oEntry['url']
+            for oEntry in oManifest if 'url' in oEntry]
+
+
+@functools.lru_cache(maxsize=None)
+def guessMimeType(sExt):
+    """Get the MIME type for a file extension, cached per extension"""
+    return mimetypes.guess_type('x' + sExt)[0] or 'text/plain'
+
+
+def walkDir(sBase):
+    """Recursively yield all file paths under a directory using os.scandir"""
+    with os.scandir(sBase) as oIter:
+        for oEntry in oIter:
+            if oEntry.is_dir(follow_symlinks=False):
+                yield from walkDir(oEntry.path)
+            else:
+                yield oEntry.path
 
 
 def getCwdFiles():
     """Get a recursive file listing of the current directory"""
-    aAllFiles = []
-    for sRoot, aDirs, aFiles in os.walk('.'):
-        for sFile in aFiles:
-            sPath = re.sub(r'^\./', '', sRoot + '/' + sFile)
-            aAllFiles.append(sPath)
-    return aAllFiles
+    return [sPath[2:] if sPath.startswith('./') else sPath for sPath in walkDir('.')]
 
 
 class Deploy:
@@ -130,11 +272,11 @@ class Deploy:
         self.DEPLOYMENTS = self.getConfigValue('general', 'deployments').split()
         self.S3_BUCKET = self.getConfigValue('general', 's3_bucket')
 
-        if searchList(self.oCmdOptions.sProduct, self.PRODUCTS) is False:
+        if self.oCmdOptions.sProduct not in self.PRODUCTS:
             errorMsg("invalid product: %s, valid products are: %s" %
                      (self.oCmdOptions.sProduct, ", ".join(self.PRODUCTS)))
 
-        if searchList(self.oCmdOptions.sDeployment, self.DEPLOYMENTS) is False:
+        if self.oCmdOptions.sDeployment not in self.DEPLOYMENTS:
             errorMsg("invalid deployment: %s, valid deployments are: %s" %
                      (self.oCmdOptions.sDeployment, ", ".join(self.DEPLOYMENTS)))
 
@@ -143,14 +285,18 @@ class Deploy:
 
         # Connect to S3 with the configured credentials and validate
         sId = os.environ.get('AWS_S3_DEPLOY_ACCESS_ID') or self.getConfigValue('aws-credentials', 'access_id')
-        sKey = os.environ.get('AWS_S3_DEPLOY_SECRET_KEY') or self.getConfigValue('aws-credentials', 'secret_key') 
-        self.oBoto = boto3.client('s3', aws_access_key_id=sId, aws_secret_access_key=sKey)
+        sKey = os.environ.get('AWS_S3_DEPLOY_SECRET_KEY') or self.getConfigValue('aws-credentials', 'secret_key')
+        self.sAwsId, self.sAwsKey = sId, sKey
+
+        self.oBoto = boto3.client('s3', aws_access_key_id=sId, aws_secret_access_key=sKey,
+                                  config=BOTO_CONFIG)
         try:
             statusMsg("Validating AWS credentials")
             self.oBoto.list_objects_v2(Bucket=self.S3_BUCKET, MaxKeys=1)
         except ClientError as e:
             awsError(e)
-        self.oBotoCF = boto3.client('cloudfront', aws_access_key_id=sId, aws_secret_access_key=sKey)
+        self.oBotoCF = boto3.client('cloudfront', aws_access_key_id=sId, aws_secret_access_key=sKey,
+                                    config=BOTO_CONFIG)
 
     def goToBuildDir(self):
         """Go to the build directory and validate files"""
@@ -189,31 +335,60 @@ class Deploy:
         self.oConfig.read(config_file)
 
     def getS3Files(self, sBucket, sPrefix):
-        """Get all files and sizes from S3"""
-        oResponse = self.oBoto.list_objects_v2(Bucket=sBucket, Prefix=sPrefix)
-        try:
-            aContents = oResponse['Contents']
-        except KeyError:
-            return {}
-
-        # Sort by last modified, newest on top
-        def get_last_modified(obj):
-            int(obj['LastModified'].strftime('%s'))
-        aContents = [obj for obj in sorted(aContents, key=get_last_modified, reverse=True)]
+        """Get all files and sizes from S3 - paginated since listings cap at 1000 keys"""
+        oPaginator = self.oBoto.get_paginator('list_objects_v2')
+        aContents = []
+        for oPage in oPaginator.paginate(Bucket=sBucket, Prefix=sPrefix,
+                                         PaginationConfig={'PageSize': 1000}):
+            aContents.extend(oPage.get('Contents', []))
 
         aFiles = {}
         for oContent in aContents:
             sKey = oContent['Key'].replace(sPrefix + '/', '')
             aFiles[sKey] = {
                 'key': sKey,
-                'etag': re.sub(r'^"(.*)"$', '\\1', oContent['ETag']),
+                'etag': ETAG_RE.sub('\\1', oContent['ETag']),
                 'size': oContent['Size'],
                 'modified': oContent['LastModified']
             }
         return aFiles
 
+    def loadChecksumCache(self):
+        """Load the local checksum cache from the build directory"""
+        self.aChecksumCache = {}
+        try:
+            with open(CHECKSUM_CACHE_FILE) as fh:
+                self.aChecksumCache = json.load(fh)
+        except (OSError, ValueError):
+            pass
+
+    def saveChecksumCache(self):
+        """Persist the local checksum cache to the build directory"""
+        try:
+            with open(CHECKSUM_CACHE_FILE, 'w') as fh:
+                json.dump(self.aChecksumCache, fh)
+        except OSError:
+            pass
+
+    def cachedChecksum(self, sPath):
+        """Get the MD5 for a file, re-hashing only when mtime or size changed"""
+        oStat = os.stat(sPath)
+        aCached = self.aChecksumCache.get(sPath)
+        if aCached and aCached[0] == oStat.st_mtime_ns and aCached[1] == oStat.st_size:
+            return aCached[2], None
+        sChecksum, bBody = md5ChecksumCached(sPath)
+        self.aChecksumCache[sPath] = [oStat.st_mtime_ns, oStat.st_size, sChecksum]
+        return sChecksum, bBody
+
+    def remoteStyleChecksum(self, sFile, sEtag):
+        """Get a local checksum in the same form as the file's S3 etag"""
+        if '-' in sEtag:
+            return multipartChecksum(sFile), None
+        return self.cachedChecksum(sFile)
+
     def compareFiles(self, aBuildFiles, aS3FileInfo):
         """Get a list of new build files and old S3 files"""
+        self.aBodyCache = {}
         aS3Files = aS3FileInfo.keys()
         setBuild = set(aBuildFiles)
         setS3 = set(aS3Files)
@@ -221,58 +396,146 @@ class Deploy:
         aOldS3Files = list(setS3 - setBuild)
         aCommonFiles = list(setBuild & setS3)
 
-        # Compare comman files by their S3 etags (always MD5 in normal circumstances)
+        # On a forced transfer every common file is new - no need to hash anything
+        if self.oCmdOptions.bForceTransfer:
+            aNewFiles.extend(aCommonFiles)
+            return aNewFiles, aOldS3Files
+
+        # A size mismatch already proves the content differs - no need to hash those.
+        # Content-hashed assets are unchanged by definition if the name is already on S3.
+        aSameSizeFiles = []
         for sFile in aCommonFiles:
-            if self.oCmdOptions.bForceTransfer or aS3FileInfo[sFile]['etag'] != md5Checksum(sFile):
-                aNewFiles.append(sFile)
 
             # Always add the manifest as new so the date is updated
-            elif re.match('precache-manifest', sFile):
+            if PRECACHE_RE.match(sFile):
+                aNewFiles.append(sFile)
+                continue
+            if HASHED_FILE_RE.search(sFile):
+                continue
+            if os.path.getsize(sFile) != aS3FileInfo[sFile]['size']:
                 aNewFiles.append(sFile)
+            else:
+                aSameSizeFiles.append(sFile)
+
+        # Hash the common files in parallel - the MD5s are disk/CPU bound and independent
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as oExecutor:
+            aChecksumJobs = {oExecutor.submit(self.remoteStyleChecksum, sFile,
+                                              aS3FileInfo[sFile]['etag']): sFile
+                             for sFile in aSameSizeFiles}
+
+            # Compare comman files by their S3 etags (always MD5 in normal circumstances)
+            for oJob in as_completed(aChecksumJobs):
+                sFile = aChecksumJobs[oJob]
+                sChecksum, bBody = oJob.result()
+                if aS3FileInfo[sFile]['etag'] != sChecksum:
+                    aNewFiles.append(sFile)
+
+                    # Keep the body so the upload doesn't read the file again
+                    if bBody is not None:
+                        self.aBodyCache[sFile] = bBody
 
         return aNewFiles, aOldS3Files
 
     def removeS3Files(self, sBucket, sPrefix, aFiles):
-        """Remove files from S3"""
-        for sFile in aFiles:
-            sKey = '%s/%s' % (sPrefix, sFile)
-            print(" - removing s3://%s/%s" % (sBucket, sKey))
+        """Remove files from S3 - batched since delete_objects takes up to 1000 keys"""
+        aKeys = [f'{sPrefix}/{sFile}' for sFile in aFiles]
+        for iStart in range(0, len(aKeys), 1000):
+            aBatch = aKeys[iStart:iStart + 1000]
+            for sKey in aBatch:
+                print(f" - removing s3://{sBucket}/{sKey}")
             if not self.oCmdOptions.bDryRun:
-                self.oBoto.delete_object(Bucket=sBucket, Key=sKey)
+                oResponse = self.oBoto.delete_objects(
+                    Bucket=sBucket,
+                    Delete={'Objects': [{'Key': sKey} for sKey in aBatch], 'Quiet': True})
+                for oError in oResponse.get('Errors', []):
+                    printStdError("Failed to remove %s: %s" % (oError['Key'], oError['Message']))
+
+    def uploadExtraArgs(self, sFile):
+        """Get the ExtraArgs (caching and content type headers) for an upload"""
+        return {'CacheControl': CACHE_ALWAYS if sFile not in NO_CACHE_SET else CACHE_NEVER,
+                'ContentType': guessMimeType(os.path.splitext(sFile)[1])}
+
+    def prepareUpload(self, sFile):
+        """Get the upload body (None to stream from disk) and ExtraArgs for a file"""
+        aExtraArgs = self.uploadExtraArgs(sFile)
+
+        # Re-use the body kept by compareFiles rather than reading the file again.
+        # Manifests stay uncompressed - maintainVersions reads them back from S3.
+        bBody = self.aBodyCache.pop(sFile, None)
+        if aExtraArgs['ContentType'] not in COMPRESS_MIME_TYPES or PRECACHE_RE.match(sFile):
+            return bBody, aExtraArgs
+
+        # Pre-compress text assets so both the upload and the downloads shrink
+        if bBody is None:
+            with open(sFile, 'rb') as fh:
+                bBody = fh.read()
+        bBody, aExtraArgs['ContentEncoding'] = compressBody(bBody)
+        return bBody, aExtraArgs
+
+    def transferOneFile(self, sBucket, sKey, sFile):
+        """Transfer a single file to S3 - called from the upload thread pool"""
+        with self.oPrintLock:
+            print(f" - transfering to s3://{sBucket}/{sKey}")
+        if not self.oCmdOptions.bDryRun:
+            bBody, aExtraArgs = self.prepareUpload(sFile)
+            if bBody is not None:
+                self.oBoto.upload_fileobj(io.BytesIO(bBody), sBucket, sKey,
+                                          Config=TRANSFER_CONFIG, ExtraArgs=aExtraArgs)
+            else:
+                self.oBoto.upload_file(sFile, sBucket, sKey, Config=TRANSFER_CONFIG,
+                                       ExtraArgs=aExtraArgs)
+
+    async def transferFilesAsync(self, sBucket, sPrefix, aFiles):
+        """Transfer files to S3 with aioboto3 - many in-flight requests, no thread per upload"""
+        oSession = aioboto3.Session()
+        oSemaphore = asyncio.Semaphore(ASYNC_TRANSFERS)
+        oLoop = asyncio.get_event_loop()
+        oConfig = Config(max_pool_connections=200,
+                         retries={'max_attempts': 10, 'mode': 'adaptive'})
+
+        async with oSession.client('s3', aws_access_key_id=self.sAwsId,
+                                   aws_secret_access_key=self.sAwsKey,
+                                   config=oConfig) as oBotoAsync:
+
+            async def transferOne(sFile, sKey):
+                async with oSemaphore:
+                    print(f" - transfering to s3://{sBucket}/{sKey}")
+                    if not self.oCmdOptions.bDryRun:
+                        bBody, aExtraArgs = await oLoop.run_in_executor(None, self.prepareUpload,
+                                                                        sFile)
+                        if bBody is not None:
+                            await oBotoAsync.put_object(Body=bBody, Bucket=sBucket, Key=sKey,
+                                                        **aExtraArgs)
+                        else:
+                            await oBotoAsync.upload_file(sFile, sBucket, sKey,
+                                                         ExtraArgs=aExtraArgs)
+
+            await asyncio.gather(*[transferOne(sFile, f'{sPrefix}/{sFile}') for sFile in aFiles])
 
     def transferFiles(self, sBucket, sPrefix, aFiles):
-        """Transfer files to S3"""
-
-        # Caching states
-        sCacheAlways = 'max-age=%d, public' % CACHE_SECONDS
-        sCacheNever = 'max-age=0, no-cache, must-revalidate, proxy-revalidate, no-store'
-
-        # Mapping file type - all others should be defined
-        mimetypes.add_type('application/octet-stream', '.map')
-
-        for sFile in aFiles:
-            sKey = '%s/%s' % (sPrefix, sFile)
-            sMime, sEncoding = mimetypes.guess_type(sFile)
-            print(" - transfering to s3://%s/%s" % (sBucket, sKey))
-            if not self.oCmdOptions.bDryRun:
-                data = open(sFile, 'rb')
-                if searchList(sFile, NO_CACHE_FILES) is False:
-                    self.oBoto.put_object(Body=data, Bucket=sBucket, CacheControl=sCacheAlways,
-                                          ContentType=sMime or "text/plain", Key=sKey)
-                else:
-                    self.oBoto.put_object(Body=data, Bucket=sBucket, CacheControl=sCacheNever,
-                                          ContentType=sMime or "text/plain", Key=sKey)
+        """Transfer files to S3 - uploads run in parallel on a shared boto3 client"""
+        if self.oCmdOptions.bAsyncTransfer:
+            if aioboto3 is not None:
+                asyncio.run(self.transferFilesAsync(sBucket, sPrefix, aFiles))
+                return
+            statusMsg("aioboto3 is not installed - using threaded transfers")
+
+        # Build the keys once - the workers then only format the progress line
+        aKeys = [f'{sPrefix}/{sFile}' for sFile in aFiles]
+        self.oPrintLock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=TRANSFER_WORKERS) as oExecutor:
+            list(oExecutor.map(lambda oPair: self.transferOneFile(sBucket, oPair[0], oPair[1]),
+                               zip(aKeys, aFiles)))
 
     def maintainVersions(self, aS3FileInfo, aOldS3Files, iVersions, sBucket, sPrefix):
         """Maintain files from older versions"""
 
-        # Get the old version files and sort by date
-        aManifests = []
-        for sKey, oFile in aS3FileInfo.items():
-            if len(aManifests) >= iVersions:
-                break
-            if re.match('precache-manifest', sKey) and searchList(sKey, aOldS3Files) is not False:
-                aManifests.append(oFile)
+        # Get the old version files, sorted by date with the newest on top
+        setOldS3 = set(aOldS3Files)
+        aManifests = [oFile for sKey, oFile in aS3FileInfo.items()
+                      if PRECACHE_RE.match(sKey) and sKey in setOldS3]
+        aManifests.sort(key=lambda oFile: oFile['modified'], reverse=True)
+        aManifests = aManifests[:iVersions]
 
         # Get the content of each manifest and add the elements to exclusion array
         aExclude = []
@@ -280,8 +543,7 @@ class Deploy:
             aExclude.append(oFile['key'])
             sKey = '%s/%s' % (sPrefix, oFile['key'])
             oResponse = self.oBoto.get_object(Bucket=sBucket, Key=sKey)
-            for sUrl in re.findall(r'"url": "/(.*?)"', str(oResponse['Body'].read())):
-                aExclude.append(sUrl)
+            aExclude.extend(parseManifestUrls(oResponse['Body'].read()))
 
         # Remove any of the excluded files from the old list
         return list(set(aOldS3Files) - set(aExclude))
@@ -292,10 +554,13 @@ class Deploy:
         if self.oCmdOptions.bInvalidCFOnly:
             return
 
-        # Get all the build files
-        aBuildFiles = getCwdFiles()
+        # Get all the build files - the checksum cache itself must never be uploaded
+        aBuildFiles = [sFile for sFile in getCwdFiles() if sFile != CHECKSUM_CACHE_FILE]
         # prettyPrint(aBuildFiles)
 
+        # Skip re-hashing files whose mtime and size are unchanged since the last run
+        self.loadChecksumCache()
+
         # Get all files and sizes from S3
         sPrefix = 'deployments/%s/%s' % (self.oCmdOptions.sProduct, self.oCmdOptions.sDeployment)
         aS3FileInfo = self.getS3Files(self.S3_BUCKET, sPrefix)
@@ -317,6 +582,8 @@ class Deploy:
         # Remove any old files
         self.removeS3Files(self.S3_BUCKET, sPrefix, aOldS3Files)
 
+        self.saveChecksumCache()
+
     def clearCloudFront(self):
         """Send a complete invalidation to the CloudFront distribution"""
         if self.oCmdOptions.bDryRun:
@@ -6,6 +6,6 @@ setup(
     name="s3-deploy",
     version='0.1',
     license='MIT',
-    install_requires=['boto3'],
+    install_requires=['boto3>=1.24.84'],
     packages=find_packages()
 )